@@ -0,0 +1,182 @@
+'''
+Business: Read-replica routing for Банный Клуб DB access
+Read-only queries go to DATABASE_READ_URL replicas (comma-separated), writes go to
+the DATABASE_URL primary. Replicas whose replay lag exceeds DATABASE_READ_MAX_LAG
+seconds are skipped.
+
+Lag is measured against the primary: a replica that has replayed the primary's
+current WAL position is 0 s behind, otherwise it is as old as its last replayed
+transaction. A replica whose WAL receiver is not streaming is unhealthy.
+
+Read-your-own-write: after a write, a bot user's session records the primary WAL
+position in session_write_lsn; the admin dashboard gets it back in the
+X-Write-Lsn header and sends it as ?min_lsn= on later reads. Those reads only use
+a replica that has replayed at least that far, whichever process or instance
+serves them.
+
+Driver-agnostic: index.py (psycopg2) and server.py (asyncpg) run the actual queries.
+'''
+import os
+import re
+import time
+from typing import Dict, Any, Optional, List, Sequence
+
+PRIMARY = 'primary'
+
+# Stays under Postgres' default max_connections=100 with room for admin sessions
+DEFAULT_POOL_TOTAL_SIZE = 80
+
+PRIMARY_LSN_SQL = "SELECT pg_current_wal_lsn()::text"
+
+LSN_PATTERN = re.compile(r'^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$')
+
+
+def replica_lag_sql(placeholder: str) -> str:
+    '''
+    Lag probe run on a replica; `placeholder` ('%s' or '$1') takes the primary's
+    pg_current_wal_lsn() as text (NULL when unknown). NULL result means unusable:
+    WAL receiver not streaming (status is only visible with pg_read_all_stats,
+    otherwise a running receiver counts as streaming) or nothing replayed yet.
+    '''
+    return f'''
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN NOT EXISTS (
+                SELECT 1 FROM pg_stat_wal_receiver WHERE COALESCE(status, 'streaming') = 'streaming'
+            ) THEN NULL
+            WHEN pg_last_wal_replay_lsn() >= {placeholder}::text::pg_lsn THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END
+    '''
+
+
+def parse_lsn(value: Any) -> Optional[str]:
+    '''Client-supplied WAL position such as '0/16B3748', or None when absent or malformed'''
+    if isinstance(value, str) and LSN_PATTERN.match(value):
+        return value
+    return None
+
+
+def pool_max_size_for(workers: int) -> int:
+    '''
+    Per-worker pool size. DB_POOL_MAX_SIZE wins when set; otherwise the
+    DB_POOL_TOTAL_SIZE budget (per database) is split across the workers.
+    '''
+    if os.environ.get('DB_POOL_MAX_SIZE'):
+        return int(os.environ['DB_POOL_MAX_SIZE'])
+    total = int(os.environ.get('DB_POOL_TOTAL_SIZE', DEFAULT_POOL_TOTAL_SIZE))
+    return max(1, total // max(1, workers))
+
+
+def member_session(telegram_id: Any) -> str:
+    '''session_write_lsn key of a bot user'''
+    return f'tg:{int(telegram_id)}'
+
+
+class DbRouter:
+    '''
+    Picks replicas for reads and counts queries per target.
+    With `counters` (a shared array holding one row of len(targets) per worker)
+    the counts add up across worker processes; otherwise they are process-local.
+    '''
+
+    def __init__(
+        self,
+        primary_url: str,
+        replica_urls: List[str],
+        max_lag: float = 5.0,
+        lag_check_interval: float = 2.0,
+        counters: Optional[Sequence[int]] = None,
+        worker: int = 0
+    ):
+        self.primary_url = primary_url
+        self.replicas: Dict[str, str] = {
+            f'replica-{i}': url for i, url in enumerate(replica_urls)
+        }
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.targets: List[str] = [PRIMARY, *self.replicas]
+        self._target_index = {name: i for i, name in enumerate(self.targets)}
+        self._counters = counters
+        self._counter_offset = worker * len(self.targets)
+        self._local_counts: Dict[str, int] = {name: 0 for name in self.targets}
+        self._lag: Dict[str, Optional[float]] = {name: None for name in self.replicas}
+        self._lag_checked_at: Dict[str, float] = {name: 0.0 for name in self.replicas}
+        self._next_replica = 0
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> 'DbRouter':
+        read_urls = os.environ.get('DATABASE_READ_URL', '')
+        return cls(
+            os.environ.get('DATABASE_URL', ''),
+            [url.strip() for url in read_urls.split(',') if url.strip()],
+            max_lag=float(os.environ.get('DATABASE_READ_MAX_LAG', 5)),
+            lag_check_interval=float(os.environ.get('DATABASE_READ_LAG_CHECK_INTERVAL', 2)),
+            **kwargs
+        )
+
+    def record_lag(self, name: str, lag: Optional[float]) -> None:
+        '''Store a lag measurement; None marks the replica unreachable or unusable'''
+        self._lag[name] = lag
+        self._lag_checked_at[name] = time.monotonic()
+
+    def needs_lag_check(self, name: str) -> bool:
+        return time.monotonic() - self._lag_checked_at[name] >= self.lag_check_interval
+
+    def is_healthy(self, name: str) -> bool:
+        lag = self._lag[name]
+        return lag is not None and lag <= self.max_lag
+
+    def has_read_candidates(self, measured_only: bool = False) -> bool:
+        '''
+        Whether a read could go to a replica. With measured_only, replicas due for a
+        lag check do not count (server.py's monitor keeps measurements current).
+        '''
+        return any(
+            self.is_healthy(name) or (not measured_only and self.needs_lag_check(name))
+            for name in self.replicas
+        )
+
+    def read_candidates(self) -> List[str]:
+        '''
+        Replicas to try for a read, round-robin, skipping ones known to lag.
+        Replicas due for a lag check are included so callers can re-measure them.
+        Empty list means read from the primary.
+        '''
+        if not self.replicas:
+            return []
+
+        names = list(self.replicas)
+        start = self._next_replica % len(names)
+        self._next_replica += 1
+        ordered = names[start:] + names[:start]
+        return [name for name in ordered if self.is_healthy(name) or self.needs_lag_check(name)]
+
+    def count(self, name: str, queries: int = 1) -> None:
+        if self._counters is None:
+            self._local_counts[name] += queries
+        else:
+            # Each worker only writes its own row, so no lock is needed
+            self._counters[self._counter_offset + self._target_index[name]] += queries
+
+    def query_counts(self) -> Dict[str, int]:
+        if self._counters is None:
+            return dict(self._local_counts)
+
+        size = len(self.targets)
+        workers = len(self._counters) // size
+        return {
+            name: sum(self._counters[w * size + i] for w in range(workers))
+            for i, name in enumerate(self.targets)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        '''Query counts (all workers when shared) and replica lag as seen by this process'''
+        return {
+            'queries': self.query_counts(),
+            'replicas': {
+                name: {'lag': self._lag[name], 'healthy': self.is_healthy(name)}
+                for name in self.replicas
+            },
+            'pid': os.getpid()
+        }
@@ -1,9 +1,434 @@
 import json
 import os
 import psycopg2
-from typing import Dict, Any, Optional, List
+import psycopg2.extensions
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
+from db_router import DbRouter, PRIMARY, PRIMARY_LSN_SQL, member_session, parse_lsn, replica_lag_sql
+
+TELEGRAM_SEND_URL = 'https://api.telegram.org/bot{token}/sendMessage'
+
+NOT_REGISTERED_TEXT = 'Сначала используйте /start для регистрации'
+
+HELP_TEXT = '''📋 Доступные команды:
+
+/events - Ближайшие мероприятия
+/myevents - Мои записи
+/profile - Мой профиль
+/help - Эта справка
+
+По вопросам пишите администратору'''
+
+UPCOMING_EVENTS_SQL = '''
+    SELECT 
+        e.id,
+        e.title,
+        e.date,
+        e.time,
+        e.location,
+        e.capacity,
+        e.format,
+        COUNT(er.member_id) as registered
+    FROM events e
+    LEFT JOIN event_registrations er ON e.id = er.event_id
+    WHERE e.date >= CURRENT_DATE
+    GROUP BY e.id
+    ORDER BY e.date, e.time
+    LIMIT 5
+'''
+
+MEMBERS_LIST_SQL = '''
+    SELECT 
+        m.id,
+        m.name,
+        m.telegram_id,
+        m.phone,
+        m.joined_at,
+        m.status,
+        COUNT(DISTINCT er.event_id) as events_count
+    FROM members m
+    LEFT JOIN event_registrations er ON m.id = er.member_id
+    GROUP BY m.id
+    ORDER BY m.joined_at DESC
+'''
+
+EVENTS_LIST_SQL = '''
+    SELECT 
+        e.id,
+        e.title,
+        e.description,
+        e.date,
+        e.time,
+        e.location,
+        e.capacity,
+        e.format,
+        COUNT(er.member_id) as registered
+    FROM events e
+    LEFT JOIN event_registrations er ON e.id = er.event_id
+    GROUP BY e.id
+    ORDER BY e.date DESC, e.time DESC
+'''
+
+STATS_SQL = {
+    'total_members': "SELECT COUNT(*) FROM members",
+    'upcoming_events': "SELECT COUNT(*) FROM events WHERE date >= CURRENT_DATE",
+    'total_registrations': "SELECT COUNT(*) FROM event_registrations",
+    'total_messages': "SELECT COUNT(*) FROM messages"
+}
+
+
+def format_welcome(first_name: str, is_new: bool) -> str:
+    '''Reply text for /start'''
+    if not is_new:
+        return f'С возвращением, {first_name}! 👋\n\nИспользуй /help для списка команд'
+    
+    return f'''Привет, {first_name}! 🧖
+
+Добро пожаловать в Банный Клуб!
+
+Я помогу тебе:
+🔹 Записаться на мероприятия
+🔹 Узнать о предстоящих парениях
+🔹 Получить информацию о банях и пармастерах
+
+Используй /help для списка команд'''
+
+
+def format_events(events: List[Any]) -> str:
+    '''Reply text for /events from UPCOMING_EVENTS_SQL rows'''
+    if not events:
+        return 'Пока нет запланированных мероприятий 😔'
+    
+    response_text = '🗓 Ближайшие мероприятия:\n\n'
+    for evt in events:
+        evt_id, title, date, time, location, capacity, fmt, registered = evt
+        format_emoji = {'women': '👭', 'men': '👬', 'mixed': '👫'}
+        emoji = format_emoji.get(fmt, '🧖')
+        
+        response_text += f'''{emoji} {title}
+📅 {date.strftime("%d.%m.%Y")} в {time.strftime("%H:%M")}
+📍 {location}
+👥 Записано: {registered}/{capacity}
+/register_{evt_id}
+
+'''
+    return response_text
+
+
+def format_my_events(my_events: List[Any]) -> str:
+    '''Reply text for /myevents from (title, date, time, location, attended) rows'''
+    if not my_events:
+        return 'У вас пока нет записей на мероприятия\n\nИспользуйте /events для просмотра доступных мероприятий'
+    
+    response_text = '📝 Ваши записи:\n\n'
+    for evt in my_events:
+        title, date, time, location, attended = evt
+        emoji = '🎉' if attended else '✅'
+        
+        response_text += f'''{emoji} {title}
+📅 {date.strftime("%d.%m.%Y")} в {time.strftime("%H:%M")}
+📍 {location}
+
+'''
+    return response_text
+
+
+def format_profile(profile: Optional[Any]) -> str:
+    '''Reply text for /profile from (name, joined_at, status, attended) row'''
+    if not profile:
+        return ''
+    
+    name, joined, status, attended = profile
+    return f'''👤 Ваш профиль
+
+Имя: {name}
+Дата регистрации: {joined.strftime("%d.%m.%Y")}
+Статус: {status}
+Посещено мероприятий: {attended}'''
+
+
+def member_to_dict(row: Any) -> Dict[str, Any]:
+    '''Serialize members row (id, name, telegram_id, phone, joined_at, status[, events_count])'''
+    member = {
+        'id': row[0],
+        'name': row[1],
+        'telegram_id': row[2],
+        'username': row[3],
+        'joined_date': row[4].isoformat() if row[4] else None,
+        'status': row[5]
+    }
+    if len(row) > 6:
+        member['events_count'] = row[6]
+    return member
+
+
+def event_to_dict(row: Any) -> Dict[str, Any]:
+    '''Serialize events row (id, title, description, date, time, location, capacity, format[, registered])'''
+    evt = {
+        'id': row[0],
+        'title': row[1],
+        'description': row[2],
+        'date': row[3].isoformat() if row[3] else None,
+        'time': row[4].strftime('%H:%M') if row[4] else None,
+        'location': row[5],
+        'capacity': row[6],
+        'format': row[7]
+    }
+    if len(row) > 8:
+        evt['registered'] = row[8]
+    return evt
+
+
+def message_to_dict(row: Any) -> Dict[str, Any]:
+    '''Serialize messages row joined with member name'''
+    return {
+        'id': row[0],
+        'telegramId': row[1],
+        'text': row[2],
+        'sender': row[3],
+        'timestamp': row[4].isoformat() if row[4] else None,
+        'isRead': row[5],
+        'memberName': row[6]
+    }
+
+
+def messages_sql(limit: int) -> str:
+    '''Latest messages query for the admin inbox'''
+    return f'''
+        SELECT 
+            m.id,
+            m.telegram_id,
+            m.message_text,
+            m.sender_type,
+            m.created_at,
+            m.is_read,
+            mem.name
+        FROM messages m
+        LEFT JOIN members mem ON m.telegram_id = mem.telegram_id
+        ORDER BY m.created_at DESC
+        LIMIT {int(limit)}
+    '''
+
+
+# Lives for the warm function instance: keeps lag measurements and counters
+router = DbRouter.from_env()
+
+REPLICA_LAG_SQL = replica_lag_sql('%s')
+
+RECORD_WRITE_LSN_SQL = '''
+    INSERT INTO session_write_lsn (session_key, lsn, updated_at)
+    VALUES (%s, pg_current_wal_lsn(), now())
+    ON CONFLICT (session_key) DO UPDATE SET lsn = EXCLUDED.lsn, updated_at = EXCLUDED.updated_at
+'''
+
+READ_COMMANDS = ('/events', '/myevents', '/profile')
+
+DB_PATHS = ['members', 'events', 'stats', 'messages', 'send-message', 'db-stats']
+
+
+class RoutedCursor(psycopg2.extensions.cursor):
+    '''Cursor that counts executed queries against its routing target'''
+    target = PRIMARY
+    
+    def execute(self, query, vars=None):
+        router.count(self.target)
+        return super().execute(query, vars)
+    
+    def probe(self, query, vars=None):
+        '''Routing check that stays out of the query counters'''
+        return super().execute(query, vars)
+
+
+class PrimaryConnection:
+    '''Primary connection opened on first use, so reads served by a replica never touch the primary'''
+    
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self.conn = None
+        self.cur = None
+    
+    def cursor(self) -> Any:
+        if self.conn is None:
+            self.conn = psycopg2.connect(self.database_url)
+            self.cur = self.conn.cursor(cursor_factory=RoutedCursor)
+        return self.cur
+    
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def record_write(conn: Any, cur: Any, session_key: str) -> None:
+    '''Remember the primary WAL position after a committed write of this bot user'''
+    if not router.replicas:
+        return
+    cur.execute(RECORD_WRITE_LSN_SQL, (session_key,))
+    conn.commit()
+
+
+def write_lsn(cur: Any) -> Optional[str]:
+    '''Primary WAL position after a committed admin write, handed back to the dashboard'''
+    if not router.replicas:
+        return None
+    cur.probe(PRIMARY_LSN_SQL)
+    return cur.fetchone()[0]
+
+
+def with_write_lsn(response: Dict[str, Any], lsn: Optional[str]) -> Dict[str, Any]:
+    '''Attach X-Write-Lsn so the dashboard can send it back as ?min_lsn= on its next reads'''
+    if lsn:
+        response['headers']['X-Write-Lsn'] = lsn
+        response['headers']['Access-Control-Expose-Headers'] = 'X-Write-Lsn'
+    return response
+
+
+def session_lsn(cur: Any, session_key: str) -> Optional[str]:
+    '''WAL position a replica must have replayed to serve this bot user, read on the primary'''
+    if not router.has_read_candidates():
+        return None
+    cur.execute("SELECT lsn::text FROM session_write_lsn WHERE session_key = %s", (session_key,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def open_read_cursor(min_lsn: Optional[str], primary: PrimaryConnection) -> Tuple[Optional[Any], Optional[Any]]:
+    '''
+    Connection and cursor on a healthy replica that has replayed min_lsn,
+    or (None, None) to read from the primary
+    '''
+    primary_lsn = None
+    for name in router.read_candidates():
+        conn = None
+        try:
+            if router.needs_lag_check(name) and primary_lsn is None:
+                primary_cur = primary.cursor()
+                primary_cur.probe(PRIMARY_LSN_SQL)
+                primary_lsn = primary_cur.fetchone()[0]
+            
+            conn = psycopg2.connect(router.replicas[name], connect_timeout=3)
+            cur = conn.cursor(cursor_factory=RoutedCursor)
+            cur.target = name
+            
+            if router.needs_lag_check(name):
+                cur.probe(REPLICA_LAG_SQL, (primary_lsn,))
+                lag = cur.fetchone()[0]
+                router.record_lag(name, float(lag) if lag is not None else None)
+            
+            caught_up = True
+            if router.is_healthy(name) and min_lsn:
+                cur.probe("SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn", (min_lsn,))
+                caught_up = bool(cur.fetchone()[0])
+        except psycopg2.Error as e:
+            print(f"Replica {name} unavailable: {e}")
+            router.record_lag(name, None)
+            if conn is not None:
+                conn.close()
+            continue
+        
+        if router.is_healthy(name) and caught_up:
+            return conn, cur
+        
+        print(f"Replica {name} is behind, skipping")
+        cur.close()
+        conn.close()
+    
+    return None, None
+
+
+def run_read(run: Any, min_lsn: Optional[str], primary: PrimaryConnection) -> Any:
+    '''
+    Run read-only run(cur) on a replica that has replayed min_lsn; on the primary
+    when none qualifies or the replica fails mid-read (it is then skipped until
+    its next lag check)
+    '''
+    read_conn, read_cur = open_read_cursor(min_lsn, primary)
+    if read_conn is not None:
+        try:
+            return run(read_cur)
+        except psycopg2.Error as e:
+            print(f"Replica {read_cur.target} failed, retrying on primary: {e}")
+            router.record_lag(read_cur.target, None)
+        finally:
+            read_conn.close()
+    return run(primary.cursor())
+
+
+def fetch_upcoming_events(cur: Any) -> List[Any]:
+    cur.execute(UPCOMING_EVENTS_SQL)
+    return cur.fetchall()
+
+
+def fetch_member_id(cur: Any, telegram_id: Any) -> Optional[int]:
+    cur.execute(f"SELECT id FROM members WHERE telegram_id = {int(telegram_id)}")
+    member = cur.fetchone()
+    return member[0] if member else None
+
+
+def fetch_my_events(cur: Any, telegram_id: Any) -> Optional[List[Any]]:
+    '''Upcoming registrations of the user, None when not registered'''
+    member_id = fetch_member_id(cur, telegram_id)
+    if not member_id:
+        return None
+    
+    cur.execute(f'''
+        SELECT 
+            e.title,
+            e.date,
+            e.time,
+            e.location,
+            er.attended
+        FROM event_registrations er
+        JOIN events e ON er.event_id = e.id
+        WHERE er.member_id = {int(member_id)} AND e.date >= CURRENT_DATE
+        ORDER BY e.date, e.time
+    ''')
+    return cur.fetchall()
+
+
+def fetch_profile(cur: Any, telegram_id: Any) -> Optional[Any]:
+    '''Profile row of the user, None when not registered'''
+    member_id = fetch_member_id(cur, telegram_id)
+    if not member_id:
+        return None
+    
+    cur.execute(f'''
+        SELECT 
+            m.name,
+            m.joined_at,
+            m.status,
+            COUNT(DISTINCT CASE WHEN er.attended = true THEN er.event_id END) as events_attended
+        FROM members m
+        LEFT JOIN event_registrations er ON m.id = er.member_id
+        WHERE m.id = {int(member_id)}
+        GROUP BY m.id, m.name, m.joined_at, m.status
+    ''')
+    return cur.fetchone()
+
+
+def fetch_admin_view(cur: Any, path: str, query_params: Dict[str, Any]) -> Any:
+    '''JSON payload of a read-only admin endpoint'''
+    if path == 'members':
+        cur.execute(MEMBERS_LIST_SQL)
+        return [member_to_dict(row) for row in cur.fetchall()]
+    
+    if path == 'events':
+        cur.execute(EVENTS_LIST_SQL)
+        return [event_to_dict(row) for row in cur.fetchall()]
+    
+    if path == 'stats':
+        stats = {}
+        for key, sql in STATS_SQL.items():
+            cur.execute(sql)
+            stats[key] = cur.fetchone()[0]
+        return stats
+    
+    limit = int(query_params.get('limit', 50))
+    cur.execute(messages_sql(limit))
+    return [message_to_dict(row) for row in cur.fetchall()]
+
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Telegram bot webhook + DB API for Банный Клуб
@@ -29,7 +454,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': ''
         }
     
-    if path in ['members', 'events', 'stats', 'messages', 'send-message']:
+    if path in DB_PATHS:
         return handle_db_request(method, path, event)
     
     if method != 'POST':
@@ -77,10 +502,15 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         full_name = f"{first_name} {last_name}".strip() or username or str(telegram_id)
         
         print(f"Connecting to database...")
-        conn = psycopg2.connect(database_url)
-        cur = conn.cursor()
+        primary = PrimaryConnection(database_url)
+        cur = primary.cursor()
+        conn = primary.conn
         print(f"Database connected successfully")
         
+        min_lsn = None
+        if text.startswith(READ_COMMANDS):
+            min_lsn = session_lsn(cur, member_session(telegram_id))
+        
         response_text = ''
         
         if text.startswith('/start'):
@@ -95,72 +525,23 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 escaped_full_name = full_name.replace("'", "''")
                 today_date = datetime.now().date().isoformat()
                 cur.execute(
-                    f"INSERT INTO members (name, telegram_id, joined_at, status) VALUES ('{escaped_full_name}', {int(telegram_id)}, '{today_date}', 'new') RETURNING id"
+                    f"INSERT INTO members (name, telegram_id, joined_at, status) VALUES ('{escaped_full_name}', {int(telegram_id)}, '{today_date}', 'new') ON CONFLICT (telegram_id) DO NOTHING"
                 )
                 conn.commit()
+                record_write(conn, cur, member_session(telegram_id))
                 
-                response_text = f'''Привет, {first_name}! 🧖
-
-Добро пожаловать в Банный Клуб!
-
-Я помогу тебе:
-🔹 Записаться на мероприятия
-🔹 Узнать о предстоящих парениях
-🔹 Получить информацию о банях и пармастерах
-
-Используй /help для списка команд'''
+                response_text = format_welcome(first_name, True)
                 print(f"Set welcome response_text for new user")
             else:
-                response_text = f'С возвращением, {first_name}! 👋\n\nИспользуй /help для списка команд'
+                response_text = format_welcome(first_name, False)
                 print(f"Set welcome back response_text for existing user")
         
         elif text.startswith('/help'):
-            response_text = '''📋 Доступные команды:
-
-/events - Ближайшие мероприятия
-/myevents - Мои записи
-/profile - Мой профиль
-/help - Эта справка
-
-По вопросам пишите администратору'''
+            response_text = HELP_TEXT
         
         elif text.startswith('/events'):
-            cur.execute('''
-                SELECT 
-                    e.id,
-                    e.title,
-                    e.date,
-                    e.time,
-                    e.location,
-                    e.capacity,
-                    e.format,
-                    COUNT(er.member_id) as registered
-                FROM events e
-                LEFT JOIN event_registrations er ON e.id = er.event_id
-                WHERE e.date >= CURRENT_DATE
-                GROUP BY e.id
-                ORDER BY e.date, e.time
-                LIMIT 5
-            ''')
-            
-            events = cur.fetchall()
-            
-            if not events:
-                response_text = 'Пока нет запланированных мероприятий 😔'
-            else:
-                response_text = '🗓 Ближайшие мероприятия:\n\n'
-                for evt in events:
-                    evt_id, title, date, time, location, capacity, fmt, registered = evt
-                    format_emoji = {'women': '👭', 'men': '👬', 'mixed': '👫'}
-                    emoji = format_emoji.get(fmt, '🧖')
-                    
-                    response_text += f'''{emoji} {title}
-📅 {date.strftime("%d.%m.%Y")} в {time.strftime("%H:%M")}
-📍 {location}
-👥 Записано: {registered}/{capacity}
-/register_{evt_id}
-
-'''
+            events = run_read(fetch_upcoming_events, min_lsn, primary)
+            response_text = format_events(events)
         
         elif text.startswith('/register_'):
             try:
@@ -170,7 +551,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 member = cur.fetchone()
                 
                 if not member:
-                    response_text = 'Сначала используйте /start для регистрации'
+                    response_text = NOT_REGISTERED_TEXT
                 else:
                     member_id = member[0]
                     
@@ -182,92 +563,45 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     if existing_reg:
                         response_text = 'Вы уже записаны на это мероприятие ✅'
                     else:
-                        cur.execute(
-                            f"SELECT capacity, (SELECT COUNT(*) FROM event_registrations WHERE event_id = {int(event_id)}) as registered FROM events WHERE id = {int(event_id)}"
-                        )
+                        # Lock the event row first; the count below then runs with a fresh
+                        # snapshot that sees registrations committed while we waited for the lock
+                        cur.execute(f"SELECT capacity FROM events WHERE id = {int(event_id)} FOR UPDATE")
                         capacity_check = cur.fetchone()
                         
-                        if capacity_check and capacity_check[1] >= capacity_check[0]:
+                        registered = 0
+                        if capacity_check:
+                            cur.execute(f"SELECT COUNT(*) FROM event_registrations WHERE event_id = {int(event_id)}")
+                            registered = cur.fetchone()[0]
+                        
+                        if capacity_check and registered >= capacity_check[0]:
+                            conn.rollback()
                             response_text = 'К сожалению, все места заняты 😔'
                         else:
                             now_timestamp = datetime.now().isoformat()
                             cur.execute(
-                                f"INSERT INTO event_registrations (event_id, member_id, registered_at) VALUES ({int(event_id)}, {int(member_id)}, '{now_timestamp}')"
+                                f"INSERT INTO event_registrations (event_id, member_id, registered_at) VALUES ({int(event_id)}, {int(member_id)}, '{now_timestamp}') ON CONFLICT (event_id, member_id) DO NOTHING"
                             )
                             conn.commit()
+                            record_write(conn, cur, member_session(telegram_id))
                             response_text = 'Отлично! Вы записаны на мероприятие 🎉'
             except (ValueError, IndexError):
                 response_text = 'Неверный формат команды'
         
         elif text.startswith('/myevents'):
-            cur.execute(f"SELECT id FROM members WHERE telegram_id = {int(telegram_id)}")
-            member = cur.fetchone()
+            my_events = run_read(lambda c: fetch_my_events(c, telegram_id), min_lsn, primary)
             
-            if not member:
-                response_text = 'Сначала используйте /start для регистрации'
+            if my_events is None:
+                response_text = NOT_REGISTERED_TEXT
             else:
-                member_id = member[0]
-                
-                cur.execute(f'''
-                    SELECT 
-                        e.title,
-                        e.date,
-                        e.time,
-                        e.location,
-                        er.attended
-                    FROM event_registrations er
-                    JOIN events e ON er.event_id = e.id
-                    WHERE er.member_id = {int(member_id)} AND e.date >= CURRENT_DATE
-                    ORDER BY e.date, e.time
-                ''')
-                
-                my_events = cur.fetchall()
-                
-                if not my_events:
-                    response_text = 'У вас пока нет записей на мероприятия\n\nИспользуйте /events для просмотра доступных мероприятий'
-                else:
-                    response_text = '📝 Ваши записи:\n\n'
-                    for evt in my_events:
-                        title, date, time, location, attended = evt
-                        emoji = '🎉' if attended else '✅'
-                        
-                        response_text += f'''{emoji} {title}
-📅 {date.strftime("%d.%m.%Y")} в {time.strftime("%H:%M")}
-📍 {location}
-
-'''
+                response_text = format_my_events(my_events)
         
         elif text.startswith('/profile'):
-            cur.execute(f"SELECT id FROM members WHERE telegram_id = {int(telegram_id)}")
-            member = cur.fetchone()
+            profile = run_read(lambda c: fetch_profile(c, telegram_id), min_lsn, primary)
             
-            if not member:
-                response_text = 'Сначала используйте /start для регистрации'
+            if profile is None:
+                response_text = NOT_REGISTERED_TEXT
             else:
-                member_id = member[0]
-                
-                cur.execute(f'''
-                    SELECT 
-                        m.name,
-                        m.joined_at,
-                        m.status,
-                        COUNT(DISTINCT CASE WHEN er.attended = true THEN er.event_id END) as events_attended
-                    FROM members m
-                    LEFT JOIN event_registrations er ON m.id = er.member_id
-                    WHERE m.id = {int(member_id)}
-                    GROUP BY m.id, m.name, m.joined_at, m.status
-                ''')
-                
-                profile = cur.fetchone()
-                
-                if profile:
-                    name, joined, status, attended = profile
-                    response_text = f'''👤 Ваш профиль
-
-Имя: {name}
-Дата регистрации: {joined.strftime("%d.%m.%Y")}
-Статус: {status}
-Посещено мероприятий: {attended}'''
+                response_text = format_profile(profile)
         
         else:
             if text.startswith('/'):
@@ -297,7 +631,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             print(f"Sending response to {chat_id}: {response_text[:50]}...")
             try:
-                url = f'https://api.telegram.org/bot{bot_token}/sendMessage'
+                url = TELEGRAM_SEND_URL.format(token=bot_token)
                 data = urllib.parse.urlencode({
                     'chat_id': chat_id,
                     'text': response_text
@@ -344,248 +678,107 @@ def handle_db_request(method: str, path: str, event: Dict[str, Any]) -> Dict[str
             'isBase64Encoded': False
         }
     
+    if path == 'db-stats':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(router.stats()),
+            'isBase64Encoded': False
+        }
+    
+    is_read = path in ['stats', 'messages'] or (path in ['members', 'events'] and method == 'GET')
+    
     try:
-        conn = psycopg2.connect(database_url)
-        cur = conn.cursor()
-        
-        if path == 'members':
-            if method == 'GET':
-                cur.execute('''
-                    SELECT 
-                        m.id,
-                        m.name,
-                        m.telegram_id,
-                        m.phone,
-                        m.joined_at,
-                        m.status,
-                        COUNT(DISTINCT er.event_id) as events_count
-                    FROM members m
-                    LEFT JOIN event_registrations er ON m.id = er.member_id
-                    GROUP BY m.id
-                    ORDER BY m.joined_at DESC
-                ''')
-                
-                members = []
-                for row in cur.fetchall():
-                    members.append({
-                        'id': row[0],
-                        'name': row[1],
-                        'telegram_id': row[2],
-                        'username': row[3],
-                        'joined_date': row[4].isoformat() if row[4] else None,
-                        'status': row[5],
-                        'events_count': row[6]
-                    })
-                
-                cur.close()
-                conn.close()
-                
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps(members),
-                    'isBase64Encoded': False
-                }
-            
-            elif method == 'POST':
-                body = json.loads(event.get('body', '{}'))
-                name = body.get('name', '')
-                telegram_id = body.get('telegram_id')
-                username = body.get('username', '')
-                status = body.get('status', 'new')
-                
-                escaped_name = name.replace("'", "''")
-                escaped_username = username.replace("'", "''")
-                escaped_status = status.replace("'", "''")
-                today_date = datetime.now().date().isoformat()
-                
-                cur.execute(
-                    f"INSERT INTO members (name, telegram_id, phone, joined_at, status) VALUES ('{escaped_name}', {int(telegram_id) if telegram_id else 'NULL'}, '{escaped_username}', '{today_date}', '{escaped_status}') RETURNING id, name, telegram_id, phone, joined_at, status"
+        if is_read:
+            query_params = event.get('queryStringParameters') or {}
+            primary = PrimaryConnection(database_url)
+            try:
+                payload = run_read(
+                    lambda c: fetch_admin_view(c, path, query_params),
+                    parse_lsn(query_params.get('min_lsn')),
+                    primary
                 )
-                
-                result = cur.fetchone()
-                conn.commit()
-                cur.close()
-                conn.close()
-                
-                return {
-                    'statusCode': 201,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({
-                        'id': result[0],
-                        'name': result[1],
-                        'telegram_id': result[2],
-                        'username': result[3],
-                        'joined_date': result[4].isoformat() if result[4] else None,
-                        'status': result[5]
-                    }),
-                    'isBase64Encoded': False
-                }
-        
-        elif path == 'events':
-            if method == 'GET':
-                cur.execute('''
-                    SELECT 
-                        e.id,
-                        e.title,
-                        e.description,
-                        e.date,
-                        e.time,
-                        e.location,
-                        e.capacity,
-                        e.format,
-                        COUNT(er.member_id) as registered
-                    FROM events e
-                    LEFT JOIN event_registrations er ON e.id = er.event_id
-                    GROUP BY e.id
-                    ORDER BY e.date DESC, e.time DESC
-                ''')
-                
-                events = []
-                for row in cur.fetchall():
-                    events.append({
-                        'id': row[0],
-                        'title': row[1],
-                        'description': row[2],
-                        'date': row[3].isoformat() if row[3] else None,
-                        'time': row[4].strftime('%H:%M') if row[4] else None,
-                        'location': row[5],
-                        'capacity': row[6],
-                        'format': row[7],
-                        'registered': row[8]
-                    })
-                
-                cur.close()
-                conn.close()
-                
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps(events),
-                    'isBase64Encoded': False
-                }
+            finally:
+                primary.close()
             
-            elif method == 'POST':
-                body = json.loads(event.get('body', '{}'))
-                
-                title = body.get('title', '').replace("'", "''")
-                description = body.get('description', '').replace("'", "''")
-                date_val = body.get('date', '')
-                time_val = body.get('time', '')
-                location = body.get('location', '').replace("'", "''")
-                capacity = int(body.get('capacity', 10))
-                format_val = body.get('format', 'mixed').replace("'", "''")
-                
-                cur.execute(
-                    f"INSERT INTO events (title, description, date, time, location, capacity, format) VALUES ('{title}', '{description}', '{date_val}', '{time_val}', '{location}', {capacity}, '{format_val}') RETURNING id, title, description, date, time, location, capacity, format"
-                )
-                
-                result = cur.fetchone()
-                conn.commit()
-                cur.close()
-                conn.close()
-                
-                return {
-                    'statusCode': 201,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({
-                        'id': result[0],
-                        'title': result[1],
-                        'description': result[2],
-                        'date': result[3].isoformat() if result[3] else None,
-                        'time': result[4].strftime('%H:%M') if result[4] else None,
-                        'location': result[5],
-                        'capacity': result[6],
-                        'format': result[7]
-                    }),
-                    'isBase64Encoded': False
-                }
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps(payload),
+                'isBase64Encoded': False
+            }
         
-        elif path == 'stats':
-            cur.execute("SELECT COUNT(*) FROM members")
-            total_members = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM events WHERE date >= CURRENT_DATE")
-            upcoming_events = cur.fetchone()[0]
+        conn = psycopg2.connect(database_url)
+        cur = conn.cursor(cursor_factory=RoutedCursor)
+        
+        if path == 'members' and method == 'POST':
+            body = json.loads(event.get('body', '{}'))
+            name = body.get('name', '')
+            telegram_id = body.get('telegram_id')
+            username = body.get('username', '')
+            status = body.get('status', 'new')
             
-            cur.execute("SELECT COUNT(*) FROM event_registrations")
-            total_registrations = cur.fetchone()[0]
+            escaped_name = name.replace("'", "''")
+            escaped_username = username.replace("'", "''")
+            escaped_status = status.replace("'", "''")
+            today_date = datetime.now().date().isoformat()
             
-            cur.execute("SELECT COUNT(*) FROM messages")
-            total_messages = cur.fetchone()[0]
+            cur.execute(
+                f"INSERT INTO members (name, telegram_id, phone, joined_at, status) VALUES ('{escaped_name}', {int(telegram_id) if telegram_id else 'NULL'}, '{escaped_username}', '{today_date}', '{escaped_status}') RETURNING id, name, telegram_id, phone, joined_at, status"
+            )
             
+            result = cur.fetchone()
+            conn.commit()
+            lsn = write_lsn(cur)
             cur.close()
             conn.close()
             
-            return {
-                'statusCode': 200,
+            return with_write_lsn({
+                'statusCode': 201,
                 'headers': {
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps({
-                    'total_members': total_members,
-                    'upcoming_events': upcoming_events,
-                    'total_registrations': total_registrations,
-                    'total_messages': total_messages
-                }),
+                'body': json.dumps(member_to_dict(result)),
                 'isBase64Encoded': False
-            }
+            }, lsn)
         
-        elif path == 'messages':
-            limit = int(event.get('queryStringParameters', {}).get('limit', 50))
+        elif path == 'events' and method == 'POST':
+            body = json.loads(event.get('body', '{}'))
             
-            cur.execute(f'''
-                SELECT 
-                    m.id,
-                    m.telegram_id,
-                    m.message_text,
-                    m.sender_type,
-                    m.created_at,
-                    m.is_read,
-                    mem.name
-                FROM messages m
-                LEFT JOIN members mem ON m.telegram_id = mem.telegram_id
-                ORDER BY m.created_at DESC
-                LIMIT {int(limit)}
-            ''')
+            title = body.get('title', '').replace("'", "''")
+            description = body.get('description', '').replace("'", "''")
+            date_val = body.get('date', '')
+            time_val = body.get('time', '')
+            location = body.get('location', '').replace("'", "''")
+            capacity = int(body.get('capacity', 10))
+            format_val = body.get('format', 'mixed').replace("'", "''")
             
-            messages = []
-            for row in cur.fetchall():
-                messages.append({
-                    'id': row[0],
-                    'telegramId': row[1],
-                    'text': row[2],
-                    'sender': row[3],
-                    'timestamp': row[4].isoformat() if row[4] else None,
-                    'isRead': row[5],
-                    'memberName': row[6]
-                })
+            cur.execute(
+                f"INSERT INTO events (title, description, date, time, location, capacity, format) VALUES ('{title}', '{description}', '{date_val}', '{time_val}', '{location}', {capacity}, '{format_val}') RETURNING id, title, description, date, time, location, capacity, format"
+            )
             
+            result = cur.fetchone()
+            conn.commit()
+            lsn = write_lsn(cur)
             cur.close()
             conn.close()
             
-            return {
-                'statusCode': 200,
+            return with_write_lsn({
+                'statusCode': 201,
                 'headers': {
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps(messages),
+                'body': json.dumps(event_to_dict(result)),
                 'isBase64Encoded': False
-            }
+            }, lsn)
         
         elif path == 'send-message':
             if method != 'POST':
@@ -621,7 +814,7 @@ def handle_db_request(method: str, path: str, event: Dict[str, Any]) -> Dict[str
             import urllib.parse
             
             try:
-                url = f'https://api.telegram.org/bot{bot_token}/sendMessage'
+                url = TELEGRAM_SEND_URL.format(token=bot_token)
                 data = urllib.parse.urlencode({
                     'chat_id': telegram_id,
                     'text': message_text
@@ -637,10 +830,11 @@ def handle_db_request(method: str, path: str, event: Dict[str, Any]) -> Dict[str
                     f"INSERT INTO messages (telegram_id, message_text, sender_type, created_at, admin_name) VALUES ({int(telegram_id)}, '{escaped_message_text}', 'admin', '{now_timestamp}', '{escaped_admin_name}')"
                 )
                 conn.commit()
+                lsn = write_lsn(cur)
                 cur.close()
                 conn.close()
                 
-                return {
+                return with_write_lsn({
                     'statusCode': 200,
                     'headers': {
                         'Content-Type': 'application/json',
@@ -648,7 +842,7 @@ def handle_db_request(method: str, path: str, event: Dict[str, Any]) -> Dict[str
                     },
                     'body': json.dumps({'ok': True}),
                     'isBase64Encoded': False
-                }
+                }, lsn)
             except Exception as e:
                 cur.close()
                 conn.close()
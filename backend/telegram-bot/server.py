@@ -0,0 +1,659 @@
+'''
+Business: Self-hosted asyncio server for Банный Клуб (Telegram webhook + DB API)
+Runs the same commands and admin endpoints as index.handler, but as a long-lived
+aiohttp app with an asyncpg pool and one shared HTTP client for Telegram.
+
+Usage: pip install -r requirements-server.txt && python server.py
+Env: TELEGRAM_BOT_TOKEN, DATABASE_URL, SERVER_HOST (0.0.0.0), SERVER_PORT (8080),
+     SERVER_WORKERS (cpu count), SERVER_SHUTDOWN_TIMEOUT (30),
+     DB_POOL_MIN_SIZE (2), DB_POOL_TOTAL_SIZE (80, split across workers),
+     DB_POOL_MAX_SIZE (per worker, overrides the split),
+     DATABASE_READ_URL and friends for read replicas (see db_router.py)
+'''
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+import aiohttp
+import asyncpg
+from aiohttp import web
+
+from db_router import (
+    DbRouter,
+    PRIMARY,
+    PRIMARY_LSN_SQL,
+    member_session,
+    parse_lsn,
+    pool_max_size_for,
+    replica_lag_sql,
+)
+from index import (
+    DB_PATHS,
+    TELEGRAM_SEND_URL,
+    NOT_REGISTERED_TEXT,
+    HELP_TEXT,
+    UPCOMING_EVENTS_SQL,
+    MEMBERS_LIST_SQL,
+    EVENTS_LIST_SQL,
+    STATS_SQL,
+    format_welcome,
+    format_events,
+    format_my_events,
+    format_profile,
+    member_to_dict,
+    event_to_dict,
+    message_to_dict,
+    messages_sql,
+    with_write_lsn,
+)
+
+# A worker that dies sooner than this after starting is treated as a crash loop
+MIN_WORKER_UPTIME = 5.0
+
+# Seconds to wait for a replica connection or routing check before using another target
+REPLICA_TIMEOUT = 3.0
+
+REPLICA_LAG_SQL = replica_lag_sql('$1')
+
+MEMBER_ID_SQL = "SELECT id FROM members WHERE telegram_id = $1"
+
+RECORD_WRITE_LSN_SQL = '''
+    INSERT INTO session_write_lsn (session_key, lsn, updated_at)
+    VALUES ($1, pg_current_wal_lsn(), now())
+    ON CONFLICT (session_key) DO UPDATE SET lsn = EXCLUDED.lsn, updated_at = EXCLUDED.updated_at
+'''
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Max-Age': '86400'
+}
+
+
+def json_result(status: int, payload: Any, cors: bool = True) -> Dict[str, Any]:
+    '''Build a handler-style response dict'''
+    headers = {'Content-Type': 'application/json'}
+    if cors:
+        headers['Access-Control-Allow-Origin'] = '*'
+    return {'statusCode': status, 'headers': headers, 'body': json.dumps(payload)}
+
+
+def to_web_response(result: Dict[str, Any]) -> web.Response:
+    '''Convert a handler-style response dict into an aiohttp response'''
+    return web.Response(
+        status=result['statusCode'],
+        headers=result.get('headers', {}),
+        text=result.get('body', '')
+    )
+
+
+async def send_telegram_message(app: web.Application, chat_id: Any, text: str) -> str:
+    '''Send a message through the shared Telegram client, raising on HTTP errors'''
+    url = TELEGRAM_SEND_URL.format(token=app['bot_token'])
+    async with app['http'].post(url, data={'chat_id': str(chat_id), 'text': text}) as response:
+        response.raise_for_status()
+        return await response.text()
+
+
+class RoutedConnection:
+    '''Pooled connection that counts queries against its routing target, like index.RoutedCursor'''
+
+    def __init__(self, conn: asyncpg.Connection, router: DbRouter, target: str):
+        self.conn = conn
+        self.router = router
+        self.target = target
+
+    async def execute(self, query: str, *args: Any) -> str:
+        self.router.count(self.target)
+        return await self.conn.execute(query, *args)
+
+    async def fetch(self, query: str, *args: Any) -> List[asyncpg.Record]:
+        self.router.count(self.target)
+        return await self.conn.fetch(query, *args)
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[asyncpg.Record]:
+        self.router.count(self.target)
+        return await self.conn.fetchrow(query, *args)
+
+    async def fetchval(self, query: str, *args: Any) -> Any:
+        self.router.count(self.target)
+        return await self.conn.fetchval(query, *args)
+
+    async def probe(self, query: str, *args: Any) -> Any:
+        '''Routing check that stays out of the query counters'''
+        return await self.conn.fetchval(query, *args, timeout=REPLICA_TIMEOUT)
+
+    def transaction(self):
+        return self.conn.transaction()
+
+
+@asynccontextmanager
+async def acquire(app: web.Application, target: str, timeout: Optional[float] = None):
+    '''Counted connection from the primary pool or a replica pool'''
+    pool = app['db'] if target == PRIMARY else app['db_replicas'][target]
+    async with pool.acquire(timeout=timeout) as conn:
+        yield RoutedConnection(conn, app['router'], target)
+
+
+async def record_write(app: web.Application, conn: RoutedConnection, session_key: str) -> None:
+    '''Remember the primary WAL position after a committed write of this bot user'''
+    if app['db_replicas']:
+        await conn.execute(RECORD_WRITE_LSN_SQL, session_key)
+
+
+async def write_lsn(app: web.Application, conn: RoutedConnection) -> Optional[str]:
+    '''Primary WAL position after a committed admin write, handed back to the dashboard'''
+    if not app['db_replicas']:
+        return None
+    return await conn.probe(PRIMARY_LSN_SQL)
+
+
+async def session_lsn(app: web.Application, session_key: str) -> Optional[str]:
+    '''
+    WAL position a replica must have replayed to serve this bot user, read on the
+    primary; skipped when no replica is healthy, as the read goes to the primary anyway
+    '''
+    if not app['router'].has_read_candidates(measured_only=True):
+        return None
+    async with acquire(app, PRIMARY) as conn:
+        return await conn.fetchval("SELECT lsn::text FROM session_write_lsn WHERE session_key = $1", session_key)
+
+
+async def read_query(app: web.Application, min_lsn: Optional[str], run: Callable[[RoutedConnection], Awaitable[Any]]) -> Any:
+    '''
+    Run read-only `run(conn)` on a healthy replica that has replayed min_lsn.
+    Falls back to the primary if none qualifies or the replica fails mid-way;
+    only connection errors mark the replica unhealthy until the next lag check.
+    '''
+    router = app['router']
+    for name in router.read_candidates():
+        if not router.is_healthy(name):
+            continue
+        try:
+            async with acquire(app, name, timeout=REPLICA_TIMEOUT) as read_conn:
+                if min_lsn and not await read_conn.probe("SELECT pg_last_wal_replay_lsn() >= $1::text::pg_lsn", min_lsn):
+                    continue
+                return await run(read_conn)
+        except asyncio.TimeoutError:
+            # Busy pool or slow check: try elsewhere, the monitor decides whether it is down.
+            # Caught before OSError, which TimeoutError subclasses on Python 3.11+
+            print(f"Replica {name} timed out, falling back")
+        except (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError) as e:
+            print(f"Replica {name} unavailable, falling back: {e}")
+            router.record_lag(name, None)
+        except asyncpg.PostgresError as e:
+            # Query-level error (e.g. a recovery conflict): the primary gives the answer
+            print(f"Replica {name} query failed, using primary: {e}")
+            break
+
+    async with acquire(app, PRIMARY) as conn:
+        return await run(conn)
+
+
+async def run_command(app: web.Application, text: str, telegram_id: int, first_name: str, full_name: str) -> str:
+    '''Execute a bot command and return the reply text (empty for plain messages)'''
+    if text.startswith('/start'):
+        async with acquire(app, PRIMARY) as conn:
+            existing = await conn.fetchval(MEMBER_ID_SQL, telegram_id)
+            if not existing:
+                await conn.execute(
+                    "INSERT INTO members (name, telegram_id, joined_at, status) VALUES ($1, $2, $3, 'new') ON CONFLICT (telegram_id) DO NOTHING",
+                    full_name, telegram_id, datetime.now().date()
+                )
+                await record_write(app, conn, member_session(telegram_id))
+        return format_welcome(first_name, not existing)
+
+    if text.startswith('/help'):
+        return HELP_TEXT
+
+    if text.startswith('/events'):
+        min_lsn = await session_lsn(app, member_session(telegram_id))
+        events = await read_query(app, min_lsn, lambda c: c.fetch(UPCOMING_EVENTS_SQL))
+        return format_events(events)
+
+    if text.startswith('/register_'):
+        try:
+            event_id = int(text.split('_')[1])
+        except (ValueError, IndexError):
+            return 'Неверный формат команды'
+
+        async with acquire(app, PRIMARY) as conn:
+            member_id = await conn.fetchval(MEMBER_ID_SQL, telegram_id)
+            if not member_id:
+                return NOT_REGISTERED_TEXT
+
+            async with conn.transaction():
+                existing_reg = await conn.fetchval(
+                    "SELECT id FROM event_registrations WHERE event_id = $1 AND member_id = $2",
+                    event_id, member_id
+                )
+                if existing_reg:
+                    return 'Вы уже записаны на это мероприятие ✅'
+
+                # Lock the event row first; the count below then runs with a fresh
+                # snapshot that sees registrations committed while we waited for the lock
+                capacity = await conn.fetchval("SELECT capacity FROM events WHERE id = $1 FOR UPDATE", event_id)
+                if capacity is not None:
+                    registered = await conn.fetchval(
+                        "SELECT COUNT(*) FROM event_registrations WHERE event_id = $1",
+                        event_id
+                    )
+                    if registered >= capacity:
+                        return 'К сожалению, все места заняты 😔'
+
+                await conn.execute(
+                    "INSERT INTO event_registrations (event_id, member_id, registered_at) VALUES ($1, $2, $3) ON CONFLICT (event_id, member_id) DO NOTHING",
+                    event_id, member_id, datetime.now()
+                )
+            await record_write(app, conn, member_session(telegram_id))
+        return 'Отлично! Вы записаны на мероприятие 🎉'
+
+    if text.startswith('/myevents'):
+        async def fetch_my_events(c: RoutedConnection) -> Optional[List[asyncpg.Record]]:
+            member_id = await c.fetchval(MEMBER_ID_SQL, telegram_id)
+            if not member_id:
+                return None
+            return await c.fetch('''
+                SELECT
+                    e.title,
+                    e.date,
+                    e.time,
+                    e.location,
+                    er.attended
+                FROM event_registrations er
+                JOIN events e ON er.event_id = e.id
+                WHERE er.member_id = $1 AND e.date >= CURRENT_DATE
+                ORDER BY e.date, e.time
+            ''', member_id)
+
+        min_lsn = await session_lsn(app, member_session(telegram_id))
+        my_events = await read_query(app, min_lsn, fetch_my_events)
+        if my_events is None:
+            return NOT_REGISTERED_TEXT
+        return format_my_events(my_events)
+
+    if text.startswith('/profile'):
+        async def fetch_profile(c: RoutedConnection) -> Optional[Any]:
+            member_id = await c.fetchval(MEMBER_ID_SQL, telegram_id)
+            if not member_id:
+                return None
+            return await c.fetchrow('''
+                SELECT
+                    m.name,
+                    m.joined_at,
+                    m.status,
+                    COUNT(DISTINCT CASE WHEN er.attended = true THEN er.event_id END) as events_attended
+                FROM members m
+                LEFT JOIN event_registrations er ON m.id = er.member_id
+                WHERE m.id = $1
+                GROUP BY m.id, m.name, m.joined_at, m.status
+            ''', member_id)
+
+        min_lsn = await session_lsn(app, member_session(telegram_id))
+        profile = await read_query(app, min_lsn, fetch_profile)
+        if profile is None:
+            return NOT_REGISTERED_TEXT
+        return format_profile(profile)
+
+    if text.startswith('/'):
+        return 'Неизвестная команда. Используйте /help для списка команд'
+
+    return ''
+
+
+async def handle_webhook(app: web.Application, body_raw: str) -> Dict[str, Any]:
+    '''Async counterpart of the webhook branch of index.handler'''
+    if not app['bot_token']:
+        return json_result(500, {'error': 'Bot token not configured'}, cors=False)
+
+    try:
+        update = json.loads(body_raw or '{}')
+
+        if 'message' not in update:
+            return json_result(200, {'ok': True}, cors=False)
+
+        message = update['message']
+        chat_id = message['chat']['id']
+        text = message.get('text', '')
+        user = message['from']
+
+        telegram_id = int(user['id'])
+        first_name = user.get('first_name', '')
+        last_name = user.get('last_name', '')
+        username = user.get('username', '')
+        full_name = f"{first_name} {last_name}".strip() or username or str(telegram_id)
+
+        response_text = await run_command(app, text, telegram_id, first_name, full_name)
+
+        async with acquire(app, PRIMARY) as conn:
+            now_timestamp = datetime.now()
+            await conn.execute(
+                "INSERT INTO messages (telegram_id, message_text, sender_type, created_at) VALUES ($1, $2, 'member', $3)",
+                telegram_id, text, now_timestamp
+            )
+            if response_text:
+                await conn.execute(
+                    "INSERT INTO messages (telegram_id, message_text, sender_type, created_at) VALUES ($1, $2, 'admin', $3)",
+                    int(chat_id), response_text, now_timestamp
+                )
+
+        if response_text:
+            try:
+                await send_telegram_message(app, chat_id, response_text)
+            except Exception as send_error:
+                print(f"Failed to send message: {send_error}")
+
+        return json_result(200, {'ok': True}, cors=False)
+
+    except Exception as e:
+        return json_result(500, {'error': str(e)}, cors=False)
+
+
+async def handle_db_request(app: web.Application, method: str, path: str, query_params: Dict[str, str], body_raw: str) -> Dict[str, Any]:
+    '''Async counterpart of index.handle_db_request'''
+    if app['db'] is None:
+        return json_result(500, {'error': 'Database not configured'})
+
+    if path == 'db-stats':
+        return json_result(200, app['router'].stats())
+
+    is_read = path in ['stats', 'messages'] or (path in ['members', 'events'] and method == 'GET')
+
+    try:
+        if path == 'send-message':
+            if method != 'POST':
+                return json_result(405, {'error': 'Method not allowed'})
+
+            body = json.loads(body_raw or '{}')
+            telegram_id = body.get('telegramId') or body.get('telegram_id')
+            message_text = body.get('message') or body.get('message_text', '')
+            admin_name = body.get('adminName', 'Администратор')
+
+            if not app['bot_token']:
+                return json_result(500, {'error': 'Bot token not configured'})
+
+            # No pooled connection is held during the Telegram round trip
+            await send_telegram_message(app, telegram_id, message_text)
+
+            async with acquire(app, PRIMARY) as conn:
+                await conn.execute(
+                    "INSERT INTO messages (telegram_id, message_text, sender_type, created_at, admin_name) VALUES ($1, $2, 'admin', $3, $4)",
+                    int(telegram_id), message_text, datetime.now(), admin_name
+                )
+                lsn = await write_lsn(app, conn)
+            return with_write_lsn(json_result(200, {'ok': True}), lsn)
+
+        if is_read:
+            # Set by the dashboard from X-Write-Lsn of its last write
+            min_lsn = parse_lsn(query_params.get('min_lsn'))
+
+            if path == 'members':
+                rows = await read_query(app, min_lsn, lambda c: c.fetch(MEMBERS_LIST_SQL))
+                return json_result(200, [member_to_dict(row) for row in rows])
+
+            elif path == 'events':
+                rows = await read_query(app, min_lsn, lambda c: c.fetch(EVENTS_LIST_SQL))
+                return json_result(200, [event_to_dict(row) for row in rows])
+
+            elif path == 'stats':
+                async def fetch_stats(c: RoutedConnection) -> Dict[str, Any]:
+                    return {key: await c.fetchval(sql) for key, sql in STATS_SQL.items()}
+
+                return json_result(200, await read_query(app, min_lsn, fetch_stats))
+
+            elif path == 'messages':
+                limit = int(query_params.get('limit', 50))
+                rows = await read_query(app, min_lsn, lambda c: c.fetch(messages_sql(limit)))
+                return json_result(200, [message_to_dict(row) for row in rows])
+
+        async with acquire(app, PRIMARY) as conn:
+            if path == 'members' and method == 'POST':
+                body = json.loads(body_raw or '{}')
+                telegram_id = body.get('telegram_id')
+
+                result = await conn.fetchrow(
+                    "INSERT INTO members (name, telegram_id, phone, joined_at, status) VALUES ($1, $2, $3, $4, $5) RETURNING id, name, telegram_id, phone, joined_at, status",
+                    body.get('name', ''),
+                    int(telegram_id) if telegram_id else None,
+                    body.get('username', ''),
+                    datetime.now().date(),
+                    body.get('status', 'new')
+                )
+                return with_write_lsn(json_result(201, member_to_dict(result)), await write_lsn(app, conn))
+
+            elif path == 'events' and method == 'POST':
+                body = json.loads(body_raw or '{}')
+
+                result = await conn.fetchrow(
+                    "INSERT INTO events (title, description, date, time, location, capacity, format) VALUES ($1, $2, $3::text::date, $4::text::time, $5, $6, $7) RETURNING id, title, description, date, time, location, capacity, format",
+                    body.get('title', ''),
+                    body.get('description', ''),
+                    body.get('date', ''),
+                    body.get('time', ''),
+                    body.get('location', ''),
+                    int(body.get('capacity', 10)),
+                    body.get('format', 'mixed')
+                )
+                return with_write_lsn(json_result(201, event_to_dict(result)), await write_lsn(app, conn))
+
+        return json_result(404, {'error': 'Not found'})
+
+    except Exception as e:
+        return json_result(500, {'error': str(e)})
+
+
+async def dispatch(request: web.Request) -> web.Response:
+    '''Route a request exactly like index.handler does'''
+    method = request.method
+    path = request.query.get('path', '')
+
+    if method == 'OPTIONS':
+        return web.Response(status=200, headers=CORS_HEADERS, text='')
+
+    body_raw = await request.text()
+
+    if path in DB_PATHS:
+        result = await handle_db_request(request.app, method, path, dict(request.query), body_raw)
+        return to_web_response(result)
+
+    if method != 'POST':
+        return to_web_response(json_result(405, {'error': 'Method not allowed'}, cors=False))
+
+    return to_web_response(await handle_webhook(request.app, body_raw))
+
+
+async def monitor_replica_lag(app: web.Application) -> None:
+    '''
+    Keep lag measurements fresh so read_query can skip replicas that fall behind or die.
+    Uses its own connections, so busy pools cannot make a replica look down.
+    '''
+    router = app['router']
+    urls = {PRIMARY: router.primary_url, **router.replicas}
+    conns: Dict[str, asyncpg.Connection] = {}
+
+    async def probe(name: str, query: str, *args: Any) -> Any:
+        if name not in conns:
+            conns[name] = await asyncpg.connect(urls[name], timeout=REPLICA_TIMEOUT)
+        try:
+            return await conns[name].fetchval(query, *args, timeout=REPLICA_TIMEOUT)
+        except (asyncio.TimeoutError, OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError):
+            # The next cycle reconnects
+            conns.pop(name).terminate()
+            raise
+
+    try:
+        while True:
+            try:
+                primary_lsn = await probe(PRIMARY, PRIMARY_LSN_SQL)
+            except (asyncio.TimeoutError, OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                # Without it the lag falls back to the last replayed transaction's age
+                print(f"Primary WAL position unavailable: {e}")
+                primary_lsn = None
+
+            for name in router.replicas:
+                try:
+                    lag = await probe(name, REPLICA_LAG_SQL, primary_lsn)
+                    router.record_lag(name, float(lag) if lag is not None else None)
+                except (asyncio.TimeoutError, OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                    print(f"Replica {name} unavailable: {e}")
+                    router.record_lag(name, None)
+
+            await asyncio.sleep(router.lag_check_interval)
+    finally:
+        for conn in conns.values():
+            conn.terminate()
+
+
+async def resources(app: web.Application):
+    '''Open DB pools and the Telegram client for the worker lifetime, close them on shutdown'''
+    router = DbRouter.from_env(counters=app['counters'], worker=app['worker'])
+    app['router'] = router
+    app['db'] = None
+    app['db_replicas'] = {}
+    pool_max_size = app['pool_max_size']
+    pool_min_size = min(int(os.environ.get('DB_POOL_MIN_SIZE', 2)), pool_max_size)
+
+    if router.primary_url:
+        app['db'] = await asyncpg.create_pool(
+            router.primary_url,
+            min_size=pool_min_size,
+            max_size=pool_max_size
+        )
+        # Replicas connect lazily so one being down does not block startup
+        for name, url in router.replicas.items():
+            app['db_replicas'][name] = await asyncpg.create_pool(
+                url,
+                min_size=0,
+                max_size=pool_max_size
+            )
+    app['http'] = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    lag_monitor = asyncio.create_task(monitor_replica_lag(app)) if app['db_replicas'] else None
+
+    yield
+
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+        await asyncio.gather(lag_monitor, return_exceptions=True)
+    await app['http'].close()
+    for pool in app['db_replicas'].values():
+        await pool.close()
+    if app['db'] is not None:
+        await app['db'].close()
+
+
+def create_app(pool_max_size: int, counters: Optional[Any] = None, worker: int = 0) -> web.Application:
+    app = web.Application()
+    app['pool_max_size'] = pool_max_size
+    app['counters'] = counters
+    app['worker'] = worker
+    app['bot_token'] = os.environ.get('TELEGRAM_BOT_TOKEN', '')
+    app.cleanup_ctx.append(resources)
+    app.router.add_route('*', '/{tail:.*}', dispatch)
+    return app
+
+
+def run_worker(
+    host: str,
+    port: int,
+    shutdown_timeout: float,
+    pool_max_size: int,
+    counters: Optional[Any] = None,
+    worker: int = 0
+) -> None:
+    '''Serve one worker; SIGTERM/SIGINT drain in-flight requests before exit'''
+    web.run_app(
+        create_app(pool_max_size, counters, worker),
+        host=host,
+        port=port,
+        reuse_port=True,
+        shutdown_timeout=shutdown_timeout,
+        print=None
+    )
+
+
+def supervised_worker(*args: Any) -> None:
+    '''
+    Worker process entry: drop the parent's signal handlers and leave the
+    terminal's process group, so shutdown signals arrive once, from the parent
+    '''
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.setpgrp()
+    run_worker(*args)
+
+
+def start_worker(*args: Any) -> multiprocessing.Process:
+    process = multiprocessing.Process(target=supervised_worker, args=args)
+    process.start()
+    return process
+
+
+def main() -> None:
+    host = os.environ.get('SERVER_HOST', '0.0.0.0')
+    port = int(os.environ.get('SERVER_PORT', 8080))
+    workers = int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1))
+    shutdown_timeout = float(os.environ.get('SERVER_SHUTDOWN_TIMEOUT', 30))
+    worker_args = (host, port, shutdown_timeout, pool_max_size_for(workers))
+
+    if workers <= 1:
+        run_worker(*worker_args)
+        return
+
+    # Query counters shared by all workers: one row of targets per worker slot
+    counters = multiprocessing.RawArray('q', workers * len(DbRouter.from_env().targets))
+    processes: List[Any] = []
+    stopping = False
+    exit_code = 0
+
+    def stop(signum: Optional[int] = None, frame: Optional[Any] = None) -> None:
+        nonlocal stopping
+        stopping = True
+        for process, _ in processes:
+            if process.is_alive():
+                process.terminate()
+
+    # Installed before forking so a signal during startup cannot orphan workers
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for worker in range(workers):
+        if stopping:
+            break
+        processes.append((start_worker(*worker_args, counters, worker), time.monotonic()))
+    print(f"Serving on {host}:{port} with {workers} workers")
+
+    # Restart workers that die while serving; give up with a non-zero exit
+    # when one dies right after start (bad config, database down) so the
+    # supervisor (systemd, Docker) sees the failure
+    while any(process.is_alive() for process, _ in processes) or not stopping:
+        for i, (process, started_at) in enumerate(processes):
+            if process.is_alive() or process.exitcode is None:
+                continue
+            if stopping:
+                continue
+            print(f"Worker {process.pid} exited with code {process.exitcode}")
+            if time.monotonic() - started_at < MIN_WORKER_UPTIME:
+                print("Worker failed right after start, shutting down")
+                exit_code = 1
+                stop()
+                continue
+            processes[i] = (start_worker(*worker_args, counters, i), time.monotonic())
+        time.sleep(1)
+
+    for process, _ in processes:
+        process.join()
+        if process.exitcode != 0:
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import multiprocessing
+
+import pytest
+
+from db_router import DbRouter, PRIMARY, parse_lsn, pool_max_size_for
+
+
+def make_router(**kwargs):
+    return DbRouter('postgresql://primary', ['postgresql://r0', 'postgresql://r1'], **kwargs)
+
+
+def test_read_candidates_rotates_over_healthy_replicas():
+    router = make_router()
+    router.record_lag('replica-0', 0.0)
+    router.record_lag('replica-1', 1.0)
+
+    assert router.read_candidates() == ['replica-0', 'replica-1']
+    assert router.read_candidates() == ['replica-1', 'replica-0']
+    assert router.read_candidates() == ['replica-0', 'replica-1']
+
+
+def test_read_candidates_skip_lagging_and_unreachable_replicas():
+    router = make_router(max_lag=5.0)
+    router.record_lag('replica-0', 30.0)
+    router.record_lag('replica-1', None)
+
+    assert router.read_candidates() == []
+    assert not router.has_read_candidates()
+
+
+def test_replicas_due_for_lag_check_are_candidates_but_not_measured():
+    router = make_router(lag_check_interval=0.0)
+    router.record_lag('replica-0', None)
+    router.record_lag('replica-1', None)
+
+    assert sorted(router.read_candidates()) == ['replica-0', 'replica-1']
+    assert router.has_read_candidates()
+    assert not router.has_read_candidates(measured_only=True)
+
+
+def test_no_replicas_means_primary():
+    router = DbRouter('postgresql://primary', [])
+
+    assert router.targets == [PRIMARY]
+    assert router.read_candidates() == []
+    assert not router.has_read_candidates()
+
+
+def test_local_counts():
+    router = make_router()
+    router.count(PRIMARY)
+    router.count('replica-1', 3)
+
+    assert router.query_counts() == {PRIMARY: 1, 'replica-0': 0, 'replica-1': 3}
+
+
+def test_query_counts_sum_shared_rows_of_all_workers():
+    targets = len(make_router().targets)
+    counters = multiprocessing.RawArray('q', 2 * targets)
+    first = make_router(counters=counters, worker=0)
+    second = make_router(counters=counters, worker=1)
+
+    first.count(PRIMARY)
+    first.count('replica-0', 2)
+    second.count('replica-0')
+    second.count('replica-1', 4)
+
+    assert list(counters) == [1, 2, 0, 0, 1, 4]
+    assert first.query_counts() == {PRIMARY: 1, 'replica-0': 3, 'replica-1': 4}
+    assert second.stats()['queries'] == first.query_counts()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('0/16B3748', '0/16B3748'),
+    ('AB/0', 'AB/0'),
+    ('', None),
+    (None, None),
+    ('0/16B3748; DROP TABLE members', None),
+    ('123456789/0', None),
+])
+def test_parse_lsn(value, expected):
+    assert parse_lsn(value) == expected
+
+
+def test_pool_max_size_splits_total_budget(monkeypatch):
+    monkeypatch.delenv('DB_POOL_MAX_SIZE', raising=False)
+    monkeypatch.delenv('DB_POOL_TOTAL_SIZE', raising=False)
+    assert pool_max_size_for(4) == 20
+
+    monkeypatch.setenv('DB_POOL_TOTAL_SIZE', '10')
+    assert pool_max_size_for(3) == 3
+    assert pool_max_size_for(64) == 1
+    assert pool_max_size_for(0) == 10
+
+
+def test_pool_max_size_override(monkeypatch):
+    monkeypatch.setenv('DB_POOL_TOTAL_SIZE', '10')
+    monkeypatch.setenv('DB_POOL_MAX_SIZE', '7')
+    assert pool_max_size_for(4) == 7
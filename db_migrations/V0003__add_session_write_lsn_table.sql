@@ -0,0 +1,7 @@
+-- Позиция WAL на primary после последней записи сессии (пользователь бота или админка).
+-- Чтения этой сессии идут только на реплики, которые уже воспроизвели эту позицию.
+CREATE TABLE IF NOT EXISTS session_write_lsn (
+    session_key VARCHAR(64) PRIMARY KEY,
+    lsn PG_LSN NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -3,6 +3,7 @@ import { Card, CardContent } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { Skeleton } from '@/components/ui/skeleton';
+import { rememberWriteLsn } from '@/lib/writeLsn';
 import Icon from '@/components/ui/icon';
 import {
   Dialog,
@@ -78,6 +79,7 @@ const EventsTab = ({ events, formatBadge, isLoading, onEventCreated }: EventsTab
       });
 
       if (response.ok) {
+        rememberWriteLsn(response);
         toast({
           title: 'Успешно',
           description: 'Мероприятие создано'
@@ -1,4 +1,5 @@
 import { useQuery } from '@tanstack/react-query';
+import { withWriteLsn } from '@/lib/writeLsn';
 
 export interface Event {
   id: number;
@@ -16,7 +17,7 @@ export const useEvents = () => {
   return useQuery({
     queryKey: ['events'],
     queryFn: async (): Promise<Event[]> => {
-      const response = await fetch('https://functions.poehali.dev/9e4889bc-77cf-4bd8-87e2-4220702d651d?path=events');
+      const response = await fetch(withWriteLsn('https://functions.poehali.dev/9e4889bc-77cf-4bd8-87e2-4220702d651d?path=events'));
       
       if (!response.ok) {
         throw new Error('Failed to fetch events');
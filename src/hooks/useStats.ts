@@ -1,4 +1,5 @@
 import { useQuery } from '@tanstack/react-query';
+import { withWriteLsn } from '@/lib/writeLsn';
 
 export interface Stats {
   totalMembers: number;
@@ -11,7 +12,7 @@ export const useStats = () => {
   return useQuery({
     queryKey: ['stats'],
     queryFn: async (): Promise<Stats> => {
-      const response = await fetch('https://functions.poehali.dev/9e4889bc-77cf-4bd8-87e2-4220702d651d?path=stats');
+      const response = await fetch(withWriteLsn('https://functions.poehali.dev/9e4889bc-77cf-4bd8-87e2-4220702d651d?path=stats'));
       
       if (!response.ok) {
         throw new Error('Failed to fetch stats');
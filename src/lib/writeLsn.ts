@@ -0,0 +1,14 @@
+// WAL position of the admin's last write (X-Write-Lsn). Sent back as min_lsn so
+// reads served by a database replica already include that write.
+let lastWriteLsn: string | null = null;
+
+export const rememberWriteLsn = (response: Response) => {
+  const lsn = response.headers.get('X-Write-Lsn');
+  if (lsn) {
+    lastWriteLsn = lsn;
+  }
+};
+
+export const withWriteLsn = (url: string) => {
+  return lastWriteLsn ? `${url}&min_lsn=${encodeURIComponent(lastWriteLsn)}` : url;
+};
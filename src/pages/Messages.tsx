@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useToast } from '@/hooks/use-toast';
+import { rememberWriteLsn, withWriteLsn } from '@/lib/writeLsn';
 import { Button } from '@/components/ui/button';
 import { Textarea } from '@/components/ui/textarea';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
@@ -27,7 +28,7 @@ const Messages = () => {
 
   const fetchMessages = async () => {
     try {
-      const response = await fetch('https://functions.poehali.dev/9e4889bc-77cf-4bd8-87e2-4220702d651d?path=messages');
+      const response = await fetch(withWriteLsn('https://functions.poehali.dev/9e4889bc-77cf-4bd8-87e2-4220702d651d?path=messages'));
       const data = await response.json();
       setMessages(Array.isArray(data) ? data : []);
       setLoading(false);
@@ -91,6 +92,7 @@ const Messages = () => {
       });
 
       if (response.ok) {
+        rememberWriteLsn(response);
         toast({
           title: 'Успешно',
           description: 'Сообщение отправлено',